@@ -5,26 +5,38 @@ This module defines the central state machine using LangGraph.
 It manages the flow: Query -> Planning -> Tool Execution -> Draft -> Safety Check.
 """
 
-from typing import TypedDict, Annotated, List, Optional
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+import asyncio
+from functools import lru_cache
+import os
+import re
+from typing import AsyncIterator, TypedDict, Annotated, List, Optional
+import uuid
+import aiosqlite
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
 # Internal Imports (Assuming these exist based on file structure)
-from app.tools.simulator import calc_pressure_flow  # The Physics Tool
-from app.tools.retriever import rag_retriever        # The Knowledge Tool
-from app.agents.safety import SafetyCritic           # The Critic
+from app.tools.simulator import calc_pressure_flow_async  # The Physics Tool
+from app.tools.retriever import rag_retriever_async        # The Knowledge Tool
+from app.agents.safety import get_safety_critic      # The Critic
+from app.schemas.planner import PlannerDecision
 from app.infrastructure.logging.stream import stream_logger
 from app.infrastructure.logging.batch import batch_logger
+from app.infrastructure.config import settings
+from app.infrastructure.http_client import get_http_client, get_async_http_client
 
 # --- 1. Define the State ---
 # This is the "Memory" of the workflow. It holds all data as it moves through the graph.
 
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The conversation history"]
+    messages: Annotated[List[BaseMessage], add_messages]  # Nodes return new messages; LangGraph appends them
     query: str
-    intent: str  # 'retrieval', 'calculation', or 'hybrid'
+    intent: str  # 'retrieval', 'calculation', 'hybrid', 'direct' (no tools), or 'trivial'
     retrieved_context: Optional[str]
     calculation_result: Optional[dict]
     draft_response: str
@@ -32,31 +44,130 @@ class AgentState(TypedDict):
     is_safe: bool
     retries: int
 
-# --- 2. Define the Nodes (The Workers) ---
+# --- 2. Shared LLM Client ---
+# Built once per process on the shared HTTP/2 clients, so keep-alive
+# connections are reused across graph steps, retry loops and embeddings.
 
-def node_planner(state: AgentState):
+@lru_cache(maxsize=1)
+def get_llm() -> ChatOpenAI:
     """
-    The Master Agent. Analyzes intent and routes the query.
+    Returns the process-wide ChatOpenAI client (High reasoning model).
+    Tests can swap it via `get_llm.cache_clear()` + monkeypatch.
+    """
+    return ChatOpenAI(
+        model="gpt-4o",
+        temperature=0,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+@lru_cache(maxsize=1)
+def get_planner_llm():
+    """
+    Returns the shared LLM bound to the PlannerDecision schema (function calling).
+    """
+    return get_llm().with_structured_output(PlannerDecision)
+
+# --- 3. Intent Patterns ---
+# Compiled once at import; each classifies the raw query in a single scan
+# (case-insensitive, no lowercased copy).
+
+# Digits + a unit -> Calculation. Two independent linear scans: a combined
+# "digit ... unit" pattern backtracks quadratically on digit-heavy text (e.g., pasted logs).
+_DIGIT_RE = re.compile(r"\d")
+_UNIT_RE = re.compile(r"psi|m3", re.IGNORECASE)
+_RETRIEVAL_RE = re.compile(r"safety|manual", re.IGNORECASE)
+
+# Queries that are only a greeting or acknowledgement (e.g., "hello", "thanks!")
+# get a templated reply: no tools, no synthesizer, no critic. Matched positively:
+# a short query that merely lacks keywords (e.g., "what should I do about the pump")
+# is a real question and goes through the planner.
+_TRIVIAL_RE = re.compile(
+    r"(?:hi|hello|hey|thanks|thank you|thx|ok|okay|great|bye|goodbye"
+    r"|good (?:morning|afternoon|evening))"
+    r"(?:\s+(?:there|team|all|again|so much|a lot))?[\s!.,]*",
+    re.IGNORECASE,
+)
+TRIVIAL_RESPONSE = (
+    "Please provide pressure/flow data (e.g., '200 m3/h' or '1100 psi') "
+    "or reference a safety manual so I can assist."
+)
+
+PLANNER_INSTRUCTIONS = """
+You are the Master Agent of an industrial engineering assistant. Decide which tools
+are needed to answer the engineer's query:
+- use_rag: search the engineering/safety manuals for technical context.
+- use_sim: run the pressure/flow physics simulator.
+Only request a tool if the answer genuinely depends on it.
+"""
+
+# Static instructions first, dynamic data last: an identical prefix across calls
+# (including retries) lets OpenAI-style prompt caching reuse its computed KV state.
+SYNTHESIZER_INSTRUCTIONS = """
+You are an Engineering Assistant. Answer the user query based on the data provided
+(retrieved manual context and simulation result).
+
+Formulate a clear recommendation. Respond ONLY with a JSON object with these keys
+(it is validated by the Safety Critic):
+- "summary": brief technical summary of the situation. No names, emails or phone numbers.
+- "risk_level": one of "LOW", "MEDIUM", "HIGH".
+- "recommended_action": the specific next step for the engineer.
+- "is_safe": true or false, your final verdict on safety.
+"""
+
+SYNTHESIZER_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYNTHESIZER_INSTRUCTIONS),
+    ("human", """
+User Query: {query}
+Retrieved Manual Context: {retrieved_context}
+Simulation Result: {calculation_result}
+{feedback}
+"""),
+])
+
+_INTENTS = {
+    (True, True): "hybrid",
+    (True, False): "retrieval",
+    (False, True): "calculation",
+    (False, False): "direct",
+}
+
+# --- 4. Define the Nodes (The Workers) ---
+
+async def node_planner(state: AgentState):
+    """
+    The Master Agent. Decides which tools (if any) the query needs and routes it.
+    Tools run on demand only: a query that needs neither skips straight to the synthesizer.
     """
     query = state["query"]
     stream_logger.log(f"[Master Agent] Analyzing query: {query}")
 
-    # Initialize LLM (High reasoning model)
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
-    
-    # Simple Routing Logic (In production, use structured output/function calling)
-    # Heuristic: If numbers/units present -> Calculation needed
-    if any(char.isdigit() for char in query) and ("psi" in query.lower() or "m3" in query.lower()):
-        intent = "calculation"
-    elif "safety" in query.lower() or "manual" in query.lower():
-        intent = "retrieval"
-    else:
-        intent = "hybrid"
+    if _TRIVIAL_RE.fullmatch(query.strip()):
+        stream_logger.log("[Master Agent] Intent classified as: trivial")
+        return {"intent": "trivial"}
+
+    # Heuristic defaults: numbers + units -> Simulator, safety/manual -> RAG
+    decision = PlannerDecision(
+        use_rag=bool(_RETRIEVAL_RE.search(query)),
+        use_sim=_DIGIT_RE.search(query) is not None and _UNIT_RE.search(query) is not None,
+    )
+
+    # Only pay for an LLM routing call when the keywords are inconclusive
+    if not (decision.use_rag or decision.use_sim):
+        try:
+            decision = await get_planner_llm().ainvoke([
+                ("system", PLANNER_INSTRUCTIONS),
+                ("human", query),
+            ])
+        except Exception as e:
+            stream_logger.log(f"[Master Agent] Routing call failed, answering without tools: {e}")
+
+    intent = _INTENTS[(decision.use_rag, decision.use_sim)]
 
     stream_logger.log(f"[Master Agent] Intent classified as: {intent}")
-    return {"intent": intent, "retries": state.get("retries", 0)}
+    return {"intent": intent}
 
-def node_retriever(state: AgentState):
+async def node_retriever(state: AgentState):
     """
     Worker: Handles Knowledge Retrieval (RAG).
     """
@@ -64,11 +175,11 @@ def node_retriever(state: AgentState):
     stream_logger.log(f"[RAG Tool] Searching manuals for: {query}")
     
     # Call the RAG interface (Mocked here for logic flow)
-    context = rag_retriever(query)
+    context = await rag_retriever_async(query)
     
     return {"retrieved_context": context}
 
-def node_simulator(state: AgentState):
+async def node_simulator(state: AgentState):
     """
     Worker: Handles Engineering Calculation (Physics).
     """
@@ -77,31 +188,65 @@ def node_simulator(state: AgentState):
     
     # In a real app, we would extract params from the query using LLM
     # Mocking a result for the flow
-    result = calc_pressure_flow(flow_rate=200) 
+    result = await calc_pressure_flow_async(flow_rate=200) 
     
     return {"calculation_result": result}
 
-def node_synthesizer(state: AgentState):
+async def node_hybrid_fanout(state: AgentState):
+    """
+    Worker: Runs Knowledge Retrieval and Physics Simulation concurrently.
+    Wall time is max(RAG, Sim) instead of their sum.
+    """
+    query = state["query"]
+    stream_logger.log(f"[Hybrid] Running RAG + physics simulation in parallel for: {query}")
+    
+    context, result = await asyncio.gather(
+        rag_retriever_async(query),
+        calc_pressure_flow_async(flow_rate=200),
+    )
+    
+    return {"retrieved_context": context, "calculation_result": result}
+
+async def node_synthesizer(state: AgentState):
     """
     Worker: Combines Tool Outputs into a Coherent Draft Response.
     """
     stream_logger.log("[Synthesizer] Generating draft response...")
     
+    # On a retry, tool outputs are reused from state; only the Critic's feedback is new
+    feedback = ""
+    if state.get("is_safe") is False:
+        feedback = f"Previous Draft Rejected By Safety Critic: {state.get('safety_feedback')}"
+    
     # Construct the prompt based on available data
-    prompt = f"""
-    You are an Engineering Assistant. Answer the user query based on the following data:
+    prompt = SYNTHESIZER_PROMPT.format_messages(
+        query=state["query"],
+        retrieved_context=state.get("retrieved_context", "N/A"),
+        calculation_result=state.get("calculation_result", "N/A"),
+        feedback=feedback,
+    )
     
-    User Query: {state['query']}
-    Retrieved Manual Context: {state.get('retrieved_context', 'N/A')}
-    Simulation Result: {state.get('calculation_result', 'N/A')}
+    # Stream tokens so the API layer can forward them (see stream_orchestrator);
+    # the Critic still runs on the full buffer once the stream closes.
+    chunks = []
+    async for chunk in get_llm().astream(prompt):
+        chunks.append(chunk.content)
     
-    Formulate a clear recommendation.
+    draft = "".join(chunks)
+    return {"draft_response": draft, "messages": [AIMessage(content=draft)]}
+
+def node_trivial_responder(state: AgentState):
     """
-    
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
-    response = llm.invoke(prompt)
-    
-    return {"draft_response": response.content}
+    Worker: Templated reply for trivial queries. Skips the LLM and the Critic,
+    since the canned text exposes no numbers or PII.
+    """
+    stream_logger.log("[Trivial Responder] Returning templated response.")
+    return {
+        "draft_response": TRIVIAL_RESPONSE,
+        "is_safe": True,
+        "safety_feedback": "Templated response: safety check not required.",
+        "messages": [AIMessage(content=TRIVIAL_RESPONSE)]
+    }
 
 def node_critic(state: AgentState):
     """
@@ -111,7 +256,9 @@ def node_critic(state: AgentState):
     stream_logger.log("[Critic] Validating safety constraints...")
     
     # Call the Safety Agent (Imported from safety.py)
-    is_safe, feedback = SafetyCritic().validate(draft)
+    result = get_safety_critic().validate(draft)
+    is_safe = result["status"] == "APPROVED"
+    feedback = result.get("reason", result["log"])
     
     batch_logger.log({
         "event": "safety_check",
@@ -120,21 +267,43 @@ def node_critic(state: AgentState):
         "feedback": feedback
     })
     
-    return {"is_safe": is_safe, "safety_feedback": feedback}
+    # Tag the draft in the conversation history with its verdict, so rejected
+    # drafts are distinguishable in the audit trail (same id -> add_messages replaces it)
+    draft_message = state["messages"][-1]
+    verdict = draft_message.model_copy(update={"additional_kwargs": {
+        **draft_message.additional_kwargs,
+        "safety_status": "APPROVED" if is_safe else "REJECTED",
+        "safety_feedback": feedback,
+    }})
+    
+    return {"is_safe": is_safe, "safety_feedback": feedback, "messages": [verdict]}
+
+def node_increment_retry(state: AgentState):
+    """
+    Worker: Bumps the retry counter before a re-draft. Conditional edges can
+    only pick a branch, so the counter has to be updated by a node.
+    """
+    retries = state.get("retries", 0) + 1
+    stream_logger.log(f"[Critic] Draft rejected, retry {retries}.")
+    return {"retries": retries}
 
-# --- 3. Define the Graph Logic (The Arrows) ---
+# --- 5. Define the Graph Logic (The Arrows) ---
 
 def decide_path(state: AgentState):
     """
     Conditional Edge: Where do we go after Planning?
     """
     intent = state["intent"]
-    if intent == "retrieval":
+    if intent == "trivial":
+        return "trivial_responder"
+    elif intent == "retrieval":
         return "retriever"
     elif intent == "calculation":
         return "simulator"
+    elif intent == "hybrid":
+        return "hybrid_fanout" # Hybrid needs both: run them side by side
     else:
-        return "retriever" # Hybrid defaults to retrieval first for context
+        return "synthesizer" # No tools requested
 
 def check_safety(state: AgentState):
     """
@@ -144,14 +313,11 @@ def check_safety(state: AgentState):
         return "approved"
     else:
         # Check if we are stuck in a loop (max retries = 2)
-        if state["retries"] >= 2:
+        if state.get("retries", 0) >= 2:
             return "max_retries_exceeded"
-        
-        # Increment retry counter
-        state["retries"] += 1
         return "rejected"
 
-# --- 4. Build the Graph ---
+# --- 6. Build the Graph ---
 
 workflow = StateGraph(AgentState)
 
@@ -159,8 +325,11 @@ workflow = StateGraph(AgentState)
 workflow.add_node("planner", node_planner)
 workflow.add_node("retriever", node_retriever)
 workflow.add_node("simulator", node_simulator)
+workflow.add_node("hybrid_fanout", node_hybrid_fanout)
 workflow.add_node("synthesizer", node_synthesizer)
 workflow.add_node("critic", node_critic)
+workflow.add_node("increment_retry", node_increment_retry)
+workflow.add_node("trivial_responder", node_trivial_responder)
 
 # Set Entry Point
 workflow.set_entry_point("planner")
@@ -172,13 +341,20 @@ workflow.add_conditional_edges(
     decide_path,
     {
         "retriever": "retriever",
-        "simulator": "simulator"
+        "simulator": "simulator",
+        "hybrid_fanout": "hybrid_fanout",
+        "synthesizer": "synthesizer",
+        "trivial_responder": "trivial_responder"
     }
 )
 
 # Tools -> Synthesizer
 workflow.add_edge("retriever", "synthesizer")
 workflow.add_edge("simulator", "synthesizer")
+workflow.add_edge("hybrid_fanout", "synthesizer")
+
+# Trivial queries end immediately
+workflow.add_edge("trivial_responder", END)
 
 # Synthesizer -> Critic
 workflow.add_edge("synthesizer", "critic")
@@ -189,29 +365,97 @@ workflow.add_conditional_edges(
     check_safety,
     {
         "approved": END,
-        "rejected": "planner", # Loop back to planner with feedback
+        "rejected": "increment_retry",
         "max_retries_exceeded": END
     }
 )
 
+# Retry -> Synthesizer (re-draft with feedback; tool outputs are kept)
+workflow.add_edge("increment_retry", "synthesizer")
+
 # Compile the Graph
 app_graph = workflow.compile()
 
-# --- 5. Runner Function (The Interface for FastAPI) ---
+# The topology is fixed after compile, so render the diagram once for /graph
+MERMAID_CACHE = app_graph.get_graph().draw_mermaid()
+
+# --- Checkpointed Graph (opt-in via settings.CHECKPOINT_ENABLED) ---
+# Persists state per thread (audit_id) in SQLite, so an interrupted run can be
+# inspected or resumed. It is not needed for retries (the rejected edge already
+# keeps tool outputs in state) and costs a write per super-step, so by default
+# runs use the in-memory app_graph. Completed runs are deleted (see
+# _release_thread); their audit trail lives in the batch logs. The saver must be
+# created inside the running event loop, so it is built on first use (and per
+# loop, e.g., in tests).
+_checkpointed_graph = None  # (event loop, connection, compiled graph)
+_checkpoint_init_lock = None  # (event loop, asyncio.Lock); asyncio locks are loop-specific
+
+def _get_checkpoint_init_lock() -> asyncio.Lock:
+    global _checkpoint_init_lock
+    loop = asyncio.get_running_loop()
+    if _checkpoint_init_lock is None or _checkpoint_init_lock[0] is not loop:
+        _checkpoint_init_lock = (loop, asyncio.Lock())
+    return _checkpoint_init_lock[1]
 
-def run_orchestrator(query: str):
+async def get_checkpointed_graph():
+    global _checkpointed_graph
+    loop = asyncio.get_running_loop()
+    if _checkpointed_graph is None or _checkpointed_graph[0] is not loop:
+        # Connecting yields to the loop; concurrent first requests must not open the DB twice
+        async with _get_checkpoint_init_lock():
+            if _checkpointed_graph is None or _checkpointed_graph[0] is not loop:
+                await close_checkpointer()
+                os.makedirs(os.path.dirname(settings.CHECKPOINT_DB_PATH) or ".", exist_ok=True)
+                conn = await aiosqlite.connect(settings.CHECKPOINT_DB_PATH)
+                _checkpointed_graph = (loop, conn, workflow.compile(checkpointer=AsyncSqliteSaver(conn)))
+    return _checkpointed_graph[2]
+
+async def close_checkpointer():
     """
-    Main function called by the API layer.
+    Closes the checkpoint DB connection. Call on shutdown: aiosqlite's worker
+    thread is not a daemon and would otherwise keep the process alive.
+    """
+    global _checkpointed_graph
+    if _checkpointed_graph is not None:
+        _, conn, _ = _checkpointed_graph
+        _checkpointed_graph = None
+        await conn.close()
+
+# --- 7. Runner Function (The Interface for FastAPI) ---
+
+def _thread_config(thread_id: Optional[str]) -> dict:
+    return {"configurable": {"thread_id": thread_id or str(uuid.uuid4())}}
+
+async def _get_graph():
+    """Returns the checkpointed graph if enabled, else the in-memory one."""
+    if settings.CHECKPOINT_ENABLED:
+        return await get_checkpointed_graph()
+    return app_graph
+
+async def _release_thread(graph, config: dict):
+    """
+    Deletes a completed run's checkpoints. Every super-step writes one, so
+    keeping them would grow the DB without bound.
     """
-    initial_state = {
+    if graph.checkpointer is None:
+        return
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        await graph.checkpointer.adelete_thread(thread_id)
+    except Exception as e:
+        stream_logger.log(f"[Checkpointer] Could not delete thread {thread_id}: {e}")
+
+def _initial_state(query: str) -> dict:
+    return {
         "messages": [HumanMessage(content=query)],
-        "query": query
+        "query": query,
+        "retries": 0
     }
-    
-    # Invoke the graph
-    final_state = app_graph.invoke(initial_state)
-    
-    # Format Output for API
+
+def _format_result(final_state: dict) -> dict:
+    """
+    Formats the final graph state for the API.
+    """
     if final_state.get("is_safe"):
         return {
             "status": "SUCCESS",
@@ -223,4 +467,60 @@ def run_orchestrator(query: str):
             "status": "BLOCKED_BY_SAFETY",
             "reason": final_state["safety_feedback"],
             "response": final_state["draft_response"]
-        }
\ No newline at end of file
+        }
+
+async def run_orchestrator(query: str, thread_id: Optional[str] = None):
+    """
+    Main function called by the API layer.
+    `thread_id` (the audit_id) keys the checkpointed state of this run,
+    when settings.CHECKPOINT_ENABLED is on.
+    """
+    graph = await _get_graph()
+    config = _thread_config(thread_id)
+    
+    # Invoke the graph
+    final_state = await graph.ainvoke(_initial_state(query), config=config)
+    await _release_thread(graph, config)
+    
+    # Format Output for API
+    return _format_result(final_state)
+
+async def stream_orchestrator(query: str, thread_id: Optional[str] = None) -> AsyncIterator[dict]:
+    """
+    Streaming variant of run_orchestrator for Server-Sent Events.
+    
+    Yields:
+        {"event": "token", "data": {"text": ...}}  - synthesizer output as it is generated
+        {"event": "retry", "data": {}}             - a rejected draft is being re-synthesized
+        {"event": "result", "data": {...}}         - same payload as run_orchestrator
+    """
+    graph = await _get_graph()
+    config = _thread_config(thread_id)
+    final_state: dict = {}
+    draft_step = None
+    
+    async for mode, payload in graph.astream(
+        _initial_state(query),
+        config=config,
+        stream_mode=["messages", "values"]
+    ):
+        if mode == "values":
+            final_state = payload
+            continue
+        
+        # The synthesizer's returned AIMessage is replayed here too; only forward chunks
+        chunk, metadata = payload
+        if metadata.get("langgraph_node") != "synthesizer" or not isinstance(chunk, AIMessageChunk) or not chunk.content:
+            continue
+        
+        # A new synthesizer step means the previous draft was rejected
+        step = metadata.get("langgraph_step")
+        if draft_step is not None and step != draft_step:
+            yield {"event": "retry", "data": {}}
+        draft_step = step
+        
+        yield {"event": "token", "data": {"text": chunk.content}}
+    
+    # Reached only if the run completed (a client disconnect stops the generator earlier)
+    await _release_thread(graph, config)
+    yield {"event": "result", "data": _format_result(final_state)}
\ No newline at end of file
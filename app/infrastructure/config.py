@@ -20,6 +20,11 @@ class Settings(BaseSettings):
     # Vector DB Configuration
     VECTOR_DB_PATH: str = "./data/chroma_db"
     
+    # Orchestrator Checkpoints (LangGraph state per audit_id)
+    # Off by default: every super-step would write to SQLite on the request path.
+    CHECKPOINT_ENABLED: bool = False
+    CHECKPOINT_DB_PATH: str = "./data/agent_state.db"
+    
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     
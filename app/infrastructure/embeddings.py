@@ -0,0 +1,93 @@
+"""
+Embeddings Client
+Provides the process-wide OpenAIEmbeddings instance and a micro-batching queue,
+so concurrent query embeddings share one HTTP request.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import asyncio
+
+from langchain_openai import OpenAIEmbeddings
+from app.infrastructure.config import settings
+from app.infrastructure.http_client import get_http_client, get_async_http_client
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    """Returns the shared embeddings client (on the shared HTTP/2 connection pool)."""
+    return OpenAIEmbeddings(
+        openai_api_key=settings.OPENAI_API_KEY,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+class EmbeddingBatcher:
+    """
+    Collects query embedding requests for up to `max_wait_seconds` (or until
+    `max_batch_size` are pending) and embeds them with a single API call.
+    Embedding endpoints charge latency per request, not per token, so N
+    concurrent queries cost one round-trip instead of N.
+    """
+
+    def __init__(self, embeddings: OpenAIEmbeddings, max_batch_size: int = 16, max_wait_seconds: float = 0.01):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        # Bound lazily to the running event loop (asyncio queues are loop-specific)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed_query(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+
+            # Keep collecting until the window closes or the batch is full
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Identical queries (e.g., a retry loop) are embedded once
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            by_text = dict(zip(texts, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+
+_batcher: Optional[EmbeddingBatcher] = None
+
+async def embed_query_batched(text: str) -> List[float]:
+    """
+    Public interface: embeds a query through the shared micro-batching queue.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher(get_embeddings())
+    return await _batcher.embed_query(text)
@@ -0,0 +1,23 @@
+"""
+Shared HTTP Clients
+Provides the process-wide HTTPX clients used for every OpenAI call (planner,
+synthesizer and embeddings), so they share one HTTP/2 connection pool.
+"""
+
+from functools import lru_cache
+
+import httpx
+
+# Keep-alive connections are reused across requests instead of paying a
+# TCP + TLS handshake per call; HTTP/2 multiplexes concurrent calls on them.
+_LIMITS = httpx.Limits(max_keepalive_connections=50, keepalive_expiry=30)
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Returns the shared synchronous client (HTTP/2)."""
+    return httpx.Client(http2=True, limits=_LIMITS)
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Returns the shared asynchronous client (HTTP/2)."""
+    return httpx.AsyncClient(http2=True, limits=_LIMITS)
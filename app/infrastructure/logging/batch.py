@@ -2,16 +2,82 @@
 Batch Logger (Phase 4: Governance)
 """
 
-import json
-import datetime
+from typing import Optional
+import atexit
+import queue
+import sys
+import threading
+import time
+import orjson
+from app.infrastructure.logging.common import now_iso, write_stdout, report_error
+
+# Records are serialized on the caller's thread, then written by a background
+# thread in batches, so stdout I/O never sits on the request path.
+MAX_BATCH_RECORDS = 64
+FLUSH_INTERVAL_SECONDS = 0.1
+
+_queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=10000)
+
+def _drain():
+    """Writes up to MAX_BATCH_RECORDS at a time, at most FLUSH_INTERVAL_SECONDS after the first."""
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+        while len(batch) < MAX_BATCH_RECORDS and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        stopping = batch[-1] is None
+        records = [record for record in batch if record is not None]
+        if records:
+            try:
+                write_stdout(b"".join(records))
+            except Exception as e:
+                # Lose this batch, not the thread: a dead drain would fill the queue
+                report_error("BatchLogger", e)
+        if stopping:
+            return
+
+_worker = threading.Thread(target=_drain, name="batch-logger", daemon=True)
+_worker.start()
+
+@atexit.register
+def _shutdown():
+    # Flush whatever is still queued before the daemon thread is torn down.
+    # Never block here: if the queue is full, the drain still gets 2 s to catch up.
+    try:
+        _queue.put_nowait(None)
+    except queue.Full:
+        pass
+    _worker.join(timeout=2.0)
+
+    # Shed records would otherwise vanish without a trace
+    if batch_logger.dropped:
+        try:
+            sys.stderr.write(f"[BatchLogger] Dropped {batch_logger.dropped} audit records (queue full).\n")
+        except Exception:
+            pass
 
 class BatchLogger:
+    def __init__(self):
+        self.dropped = 0
+
     def log(self, data: dict):
         entry = {
-            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             **data
         }
-        print(f"[AUDIT LOG]: {json.dumps(entry)}")
+        record = b"[AUDIT LOG]: " + orjson.dumps(entry, default=str) + b"\n"
+        try:
+            _queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; count what was shed
+            self.dropped += 1
 
 # ---------------------------------------------------------
 # CRITICAL: This line creates the object for main.py
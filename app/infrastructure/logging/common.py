@@ -0,0 +1,49 @@
+"""
+Logging Helpers (Phase 4: Shared by Stream & Batch Loggers)
+"""
+
+import datetime
+import sys
+import time
+
+# (epoch second, ISO-8601 string) for the most recent second seen.
+# Logs fire many times per request, so one format call per second suffices.
+_cached_second = (-1, "")
+
+def now_iso() -> str:
+    """Returns the current UTC time as ISO-8601, at one-second resolution."""
+    global _cached_second
+    second = int(time.time())
+    cached = _cached_second
+    if cached[0] != second:
+        stamp = datetime.datetime.fromtimestamp(second, tz=datetime.timezone.utc).isoformat()
+        cached = _cached_second = (second, stamp)
+    return cached[1]
+
+def write_stdout(data: bytes):
+    """
+    Writes pre-encoded bytes straight to stdout's binary buffer, skipping print().
+    Meant for batched writes: pending print() text is flushed first so the two
+    never interleave mid-line, which costs one extra write per call.
+    The bytes themselves are flushed only when stdout is interactive.
+    Text-only streams (e.g., redirect_stdout(io.StringIO())) get decoded text.
+    """
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    if buffer is None:
+        stdout.write(data.decode())
+        return
+    stdout.flush()
+    buffer.write(data)
+    if getattr(stdout, "line_buffering", False):
+        buffer.flush()
+
+def report_error(source: str, error: BaseException):
+    """
+    Reports a failure inside a logger on stderr. Logging must never fail the
+    caller, so this swallows any error of its own.
+    """
+    try:
+        sys.stderr.write(f"[{source}] Logging failed: {error!r}\n")
+    except Exception:
+        pass
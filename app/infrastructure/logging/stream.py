@@ -2,13 +2,21 @@
 Stream Logger (Phase 4: Real-time Traceability)
 """
 
-import datetime
+import sys
+
+from app.infrastructure.logging.common import now_iso, report_error
 
 class StreamLogger:
     def log(self, message: str):
         """Simulates a WebSocket stream to the UI."""
-        timestamp = datetime.datetime.utcnow().isoformat()
-        print(f"[STREAM {timestamp}]: {message}")
+        # Written through the text layer, like print(): stays ordered with other
+        # output and is only flushed per line when stdout is interactive
+        line = f"[STREAM {now_iso()}]: {message}\n"
+        try:
+            sys.stdout.write(line)
+        except Exception as e:
+            # Called from every graph node; a broken stdout must not fail the request
+            report_error("StreamLogger", e)
 
 # ---------------------------------------------------------
 # CRITICAL: This line MUST exist at the bottom of the file.
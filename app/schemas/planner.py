@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+class PlannerDecision(BaseModel):
+    """Structured routing decision emitted by the Master Agent."""
+    use_rag: bool = Field(description="True if the engineering manuals must be searched (RAG tool).")
+    use_sim: bool = Field(description="True if a pressure/flow physics simulation is required.")
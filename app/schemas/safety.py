@@ -8,3 +8,10 @@ class EngineeringSafetyReport(BaseModel):
     unit: str = Field(description="The unit of measurement (e.g., PSI, Celsius).")
     risk_level: str = Field(..., pattern='^(LOW|MEDIUM|HIGH)$', description="Categorization: LOW, MEDIUM, HIGH.")
     manual_references: List[str] = Field(description="List of specific pages or sections from the RAG tool.")
+
+class SafetyCriticOutput(BaseModel):
+    """Mirror of the RAIL output schema (agents/guardrails/safety_spec.rail)."""
+    summary: str = Field(description="Brief technical summary of the situation.")
+    risk_level: str = Field(..., pattern='^(LOW|MEDIUM|HIGH)$', description="Categorization: LOW, MEDIUM, HIGH.")
+    recommended_action: str = Field(description="Specific next step for the engineer.")
+    is_safe: bool = Field(description="Final boolean verdict on safety.")
@@ -7,9 +7,39 @@ from engineering manuals (PDFs).
 """
 
 from typing import List, Optional
+import asyncio
+import threading
+import time
+import tiktoken
 from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
-from app.infrastructure.config import settings # Assuming you have a config.py
+from app.infrastructure.embeddings import get_embeddings, embed_query_batched
+from app.tools.semantic_cache import SemanticCache
+
+# Upper bound on retrieved context handed to the synthesizer (gpt-4o tokens)
+MAX_CONTEXT_TOKENS = 1500
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+CHARS_PER_TOKEN = 4 # Rough estimate when the tokenizer is unavailable
+ENCODING_RETRY_SECONDS = 300 # Wait between load attempts after a failure
+
+_encoding: Optional[tiktoken.Encoding] = None
+_encoding_failed_at: Optional[float] = None
+
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    Loaded once per process. First use may download the BPE file; if that fails
+    (e.g., offline), budgeting falls back to a character estimate and the load
+    is retried after ENCODING_RETRY_SECONDS. Only a successful load is kept.
+    """
+    global _encoding, _encoding_failed_at
+    if _encoding is None:
+        if _encoding_failed_at is not None and time.monotonic() - _encoding_failed_at < ENCODING_RETRY_SECONDS:
+            return None
+        try:
+            _encoding = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            _encoding_failed_at = time.monotonic()
+    return _encoding
 
 class KnowledgeRetriever:
     """
@@ -21,14 +51,19 @@ class KnowledgeRetriever:
         """
         Initializes the connection to the Vector Database.
         """
-        self.embeddings = OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
+        # Shared process-wide client (see app/infrastructure/embeddings.py)
+        self.embeddings = get_embeddings()
         
         # PROTOTYPE: Using ChromaDB for local agility
         self.db = Chroma(
             persist_directory=persist_directory, 
             embedding_function=self.embeddings
         )
-        self.retriever = self.db.as_retriever(search_kwargs={"k": 3})
+        # MMR: fetch 10 candidates, keep the 3 most relevant yet mutually diverse
+        self.search_kwargs = {"k": 3, "fetch_k": 10, "lambda_mult": 0.5}
+
+        # Repeat / near-duplicate queries reuse the formatted context
+        self.cache = SemanticCache()
 
     def retrieve(self, query: str) -> str:
         """
@@ -41,26 +76,88 @@ class KnowledgeRetriever:
             str: A concatenated string of relevant document chunks.
         """
         try:
-            docs = self.retriever.invoke(query)
-            
-            if not docs:
-                return "No relevant manuals found."
+            cached = self.cache.get_exact(query)
+            if cached is not None:
+                return cached
+
+            # Embed once: the vector serves both the cache lookup and the search
+            query_embedding = self.embeddings.embed_query(query)
+            return self._search(query, query_embedding)
             
-            # Format the output for the LLM
-            formatted_context = "\n\n---\n\n".join([d.page_content for d in docs])
-            return formatted_context
+        except Exception as e:
+            return f"Error retrieving data: {str(e)}"
+
+    async def aretrieve(self, query: str) -> str:
+        """
+        Async variant of retrieve. Embeds through the shared micro-batching queue,
+        so concurrent requests share one embedding API call.
+        """
+        try:
+            cached = self.cache.get_exact(query)
+            if cached is not None:
+                return cached
+
+            query_embedding = await embed_query_batched(query)
+            return await asyncio.to_thread(self._search, query, query_embedding)
             
         except Exception as e:
             return f"Error retrieving data: {str(e)}"
 
+    def _search(self, query: str, query_embedding: List[float]) -> str:
+        """
+        Semantic cache lookup, then Vector DB search by the precomputed embedding.
+        """
+        cached = self.cache.get(query, query_embedding)
+        if cached is not None:
+            return cached
+
+        docs = self.db.max_marginal_relevance_search_by_vector(query_embedding, **self.search_kwargs)
+        
+        if not docs:
+            return "No relevant manuals found."
+        
+        # Format the output for the LLM
+        formatted_context = CHUNK_SEPARATOR.join(_fit_to_budget([d.page_content for d in docs]))
+        self.cache.put(query, query_embedding, formatted_context)
+        return formatted_context
+
+def _fit_to_budget(chunks: List[str], max_tokens: int = MAX_CONTEXT_TOKENS) -> List[str]:
+    """
+    Drops duplicate chunks and stops once the token budget is spent.
+    A first chunk that alone exceeds the budget is truncated rather than dropped.
+    """
+    encoding = _get_encoding()
+    kept: List[str] = []
+    used = 0
+    for chunk in dict.fromkeys(chunks):
+        if encoding is not None:
+            tokens = encoding.encode(chunk)
+            size = len(tokens)
+        else:
+            size = -(-len(chunk) // CHARS_PER_TOKEN)
+        if used + size > max_tokens:
+            if not kept:
+                if encoding is not None:
+                    kept.append(encoding.decode(tokens[:max_tokens]))
+                else:
+                    kept.append(chunk[:max_tokens * CHARS_PER_TOKEN])
+            break
+        kept.append(chunk)
+        used += size
+    return kept
+
 # --- Singleton Instance for the Orchestrator to use ---
 # This prevents re-initializing the DB connection on every request
 _retriever_instance = None
+_retriever_lock = threading.Lock()
 
 def get_retriever():
     global _retriever_instance
     if _retriever_instance is None:
-        _retriever_instance = KnowledgeRetriever()
+        # Concurrent first requests must not open the DB twice
+        with _retriever_lock:
+            if _retriever_instance is None:
+                _retriever_instance = KnowledgeRetriever()
     return _retriever_instance
 
 # Function signature expected by the Orchestrator
@@ -71,6 +168,13 @@ def rag_retriever(query: str) -> str:
     instance = get_retriever()
     return instance.retrieve(query)
 
+async def rag_retriever_async(query: str) -> str:
+    """
+    Async variant of rag_retriever, so retrieval can overlap with other tools.
+    """
+    instance = get_retriever()
+    return await instance.aretrieve(query)
+
 if __name__ == "__main__":
     # Test retrieval (Requires documents to be ingested first)
     print(rag_retriever("What is the H2S limit?"))
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Semantic Cache for the Knowledge Retriever (RAG)
+Phase 1: Planning & Retrieval
+
+Purpose: Remembers recently formatted manual context keyed on the query
+embedding, so repeated or near-duplicate questions (e.g., the same query
+re-planned after a safety rejection) skip the Vector DB search. Exact
+repeats are matched on the query text and skip the embedding call too.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
+import threading
+import time
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+class SemanticCache:
+    """
+    An in-memory LRU + TTL cache with cosine-similarity lookup.
+
+    A hit requires ALL of:
+      - cosine similarity >= `similarity_threshold` against a cached query,
+      - token Jaccard overlap >= `min_jaccard` between the two query texts, and
+      - the same numbers in both queries.
+    The lexical gates stop embedding-close but factually different queries
+    (e.g., "... pump A at 200 psi" vs "... pump A at 900 psi") from hijacking
+    each other's context; Jaccard alone misses this on longer queries.
+
+    Vectors live in a preallocated (max_entries x dim) matrix; each entry owns
+    one row (its slot), so a lookup is a single matrix-vector product with no copy.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        min_jaccard: float = 0.6,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.min_jaccard = min_jaccard
+
+        # slot -> (query, query tokens, query numbers, formatted context, inserted at)
+        self._entries: "OrderedDict[int, Tuple[str, frozenset, frozenset, str, float]]" = OrderedDict()
+        self._keys_by_query: Dict[str, int] = {}
+        self._free_slots: List[int] = list(range(max_entries - 1, -1, -1))
+        self._matrix: Optional[np.ndarray] = None  # allocated on first put (needs the dimension)
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._lock = threading.Lock()
+
+    def get_exact(self, query: str) -> Optional[str]:
+        """
+        Returns the cached context for this exact query text, or None.
+        Cheap enough to call before embedding the query.
+        """
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            key = self._keys_by_query.get(query)
+            if key is None:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][3]
+
+    def get(self, query: str, embedding: Sequence[float]) -> Optional[str]:
+        """
+        Returns the cached context for the closest matching query, or None.
+        """
+        q = _normalize(embedding)
+        tokens = _tokenize(query)
+        numbers = _numbers(query)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired(now)
+            if not self._entries or self._matrix.shape[1] != q.shape[0]:
+                return None
+
+            scores = self._matrix @ q
+            scores[~self._occupied] = -np.inf
+
+            # Walk candidates best-first; the lexical gates may reject the top one
+            for slot in np.argsort(scores)[::-1]:
+                if scores[slot] < self.similarity_threshold:
+                    break
+                _, cached_tokens, cached_numbers, context, _ = self._entries[slot]
+                if cached_numbers == numbers and _jaccard(tokens, cached_tokens) >= self.min_jaccard:
+                    self._entries.move_to_end(slot)
+                    return context
+        return None
+
+    def put(self, query: str, embedding: Sequence[float], context: str) -> None:
+        """
+        Stores the formatted context, evicting the least recently used entry when full.
+        """
+        vec = _normalize(embedding)
+        entry = (query, _tokenize(query), _numbers(query), context, time.monotonic())
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vec.shape[0]:
+                # First entry, or the embedding model changed: old vectors are not comparable
+                self._clear()
+                self._matrix = np.zeros((self.max_entries, vec.shape[0]), dtype=np.float32)
+
+            previous = self._keys_by_query.get(query)
+            if previous is not None:
+                self._release(previous)
+            elif not self._free_slots:
+                self._release(next(iter(self._entries)))
+
+            slot = self._free_slots.pop()
+            self._matrix[slot] = vec
+            self._occupied[slot] = True
+            self._entries[slot] = entry
+            self._keys_by_query[query] = slot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_query.clear()
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._occupied[:] = False
+
+    def _release(self, slot: int) -> None:
+        query = self._entries.pop(slot)[0]
+        del self._keys_by_query[query]
+        self._occupied[slot] = False
+        self._free_slots.append(slot)
+
+    def _evict_expired(self, now: float) -> None:
+        expired: List[int] = [
+            slot for slot, entry in self._entries.items()
+            if now - entry[4] > self.ttl_seconds
+        ]
+        for slot in expired:
+            self._release(slot)
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def _tokenize(text: str) -> frozenset:
+    return frozenset(token.lower() for token in _TOKEN_RE.findall(text))
+
+def _numbers(text: str) -> frozenset:
+    return frozenset(_NUMBER_RE.findall(text))
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
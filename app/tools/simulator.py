@@ -9,6 +9,8 @@ to the Master Agent. This ensures mathematical accuracy that LLMs cannot guarant
 from typing import TypedDict, Optional
 import math
 
+import numpy as np
+
 class SimulationResult(TypedDict):
     """
     Strict output structure for the Orchestrator.
@@ -19,6 +21,37 @@ class SimulationResult(TypedDict):
     status: str
     warning: Optional[str]
 
+# --- Physics Constants ---
+# Simplified Darcy-Weisbach / Bernoulli approximation.
+# In a real prodcution app, this would call an external solver like AspenTech or OLGA.
+# P = (f * (L/D) * (rho * v^2) / 2)
+# For the prototype, we use a simplified polynomial relation.
+
+# Mock constants
+FRICTION_FACTOR = 0.02
+PIPE_DIAMETER_M = 0.1
+FLUID_DENSITY_KG_M3 = 850
+BASELINE_PRESSURE_PSI = 1000
+
+# Derived once at import; every input above is constant
+_PA_TO_PSI = 0.000145038
+_INV_AREA_SEC = 1.0 / (math.pi * (PIPE_DIAMETER_M / 2) ** 2 * 3600) # m³/h -> m/s (3600 sec/hr)
+_K = FRICTION_FACTOR * (1.0 / PIPE_DIAMETER_M) * 0.5 * FLUID_DENSITY_KG_M3 * _PA_TO_PSI # psi per (m/s)^2
+
+def _total_pressure_psi(flow_rate):
+    """
+    Pure-numeric physics kernel shared by the scalar and batch APIs.
+    Accepts a float or a NumPy array (the arithmetic broadcasts element-wise).
+    """
+    # Convert flow rate (m³/h) to velocity (m/s)
+    velocity = flow_rate * _INV_AREA_SEC
+    
+    # Pressure Drop: dP = f * (1/D) * (0.5 * rho * v^2), already in PSI
+    delta_p_psi = _K * velocity * velocity
+    
+    # Add a baseline pressure
+    return BASELINE_PRESSURE_PSI + delta_p_psi
+
 def calc_pressure_flow(flow_rate: float, viscosity: float = 0.9) -> SimulationResult:
     """
     Simulates pressure dynamics based on flow rate.
@@ -40,27 +73,8 @@ def calc_pressure_flow(flow_rate: float, viscosity: float = 0.9) -> SimulationRe
             "warning": "Flow rate cannot be negative."
         }
 
-    # 2. Physics Logic (Simplified Darcy-Weisbach / Bernoulli approximation)
-    # In a real prodcution app, this would call an external solver like AspenTech or OLGA.
-    # P = (f * (L/D) * (rho * v^2) / 2)
-    # For the prototype, we use a simplified polynomial relation.
-    
-    # Mock constants
-    FRICTION_FACTOR = 0.02
-    PIPE_DIAMETER_M = 0.1
-    FLUID_DENSITY_KG_M3 = 850
-    
-    # Convert flow rate (m³/h) to velocity (m/s)
-    area = math.pi * (PIPE_DIAMETER_M / 2) ** 2
-    velocity = flow_rate / (area * 3600) # 3600 sec/hr
-    
-    # Calculate Pressure Drop (Delta P)
-    # dP = f * (1/D) * (0.5 * rho * v^2)
-    delta_p_pascal = FRICTION_FACTOR * (1 / PIPE_DIAMETER_M) * (0.5 * FLUID_DENSITY_KG_M3 * velocity**2)
-    delta_p_psi = delta_p_pascal * 0.000145038 # Convert Pa to PSI
-    
-    # Add a baseline pressure
-    TOTAL_PRESSURE_PSI = 1000 + delta_p_psi
+    # 2. Physics Logic (see _total_pressure_psi)
+    TOTAL_PRESSURE_PSI = _total_pressure_psi(flow_rate)
     
     # 3. Status Logic
     status = "NOMINAL"
@@ -77,6 +91,28 @@ def calc_pressure_flow(flow_rate: float, viscosity: float = 0.9) -> SimulationRe
         "warning": warning
     }
 
+def calc_pressure_flow_batch(flow_rates: np.ndarray, viscosity: float = 0.9) -> np.ndarray:
+    """
+    Vectorized variant of calc_pressure_flow for multi-row scenarios.
+    
+    Args:
+        flow_rates (np.ndarray): Fluid flow rates in m³/h.
+        viscosity (float): Fluid viscosity (default 0.9 for light crude).
+        
+    Returns:
+        np.ndarray: Estimated pressure (PSI) per row, unrounded.
+                    Negative flow rates yield 0.0, matching the scalar ERROR result.
+    """
+    flow_rates = np.asarray(flow_rates, dtype=np.float64)
+    return np.where(flow_rates < 0, 0.0, _total_pressure_psi(flow_rates))
+
+async def calc_pressure_flow_async(flow_rate: float, viscosity: float = 0.9) -> SimulationResult:
+    """
+    Async variant of calc_pressure_flow so the Orchestrator can gather it with other tools.
+    The calculation is a few flops, so it runs inline rather than in a worker thread.
+    """
+    return calc_pressure_flow(flow_rate, viscosity)
+
 # --- Helper function to allow direct execution for testing ---
 if __name__ == "__main__":
     result = calc_pressure_flow(200)
@@ -3,11 +3,17 @@ Main Application Entry Point
 FastAPI Backend for the Industrial Agent Orchestrator.
 """
 
+from contextlib import asynccontextmanager
+import asyncio
+import uuid
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.agents.orchestrator import run_orchestrator
+from app.agents.orchestrator import run_orchestrator, stream_orchestrator, close_checkpointer
 from app.infrastructure.logging.batch import batch_logger
+from app.tools.retriever import get_retriever
 
 # --- 1. API Models ---
 class QueryRequest(BaseModel):
@@ -20,10 +26,20 @@ class QueryResponse(BaseModel):
     audit_id: str
 
 # --- 2. Initialize App ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm start: open the Vector DB and build the embeddings client before the
+    # first request arrives, so no request pays the cold-start cost
+    await asyncio.to_thread(get_retriever)
+    yield
+    # Release the orchestrator's checkpoint DB on shutdown
+    await close_checkpointer()
+
 app = FastAPI(
     title="Industrial Agent Orchestrator",
     description="A multi-agent system for Field Engineers.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Middleware (Allows Streamlit UI to talk to this backend)
@@ -42,19 +58,18 @@ def health_check():
     return {"status": "healthy", "service": "Industrial Orchestrator"}
 
 @app.post("/query", response_model=QueryResponse)
-def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest):
     """
     Main entry point for the Field Engineer's query.
     Triggers the Master Agent workflow.
     """
     try:
-        # Invoke the Orchestrator (The Brain)
-        result = run_orchestrator(request.query)
-        
-        # Generate Audit ID for traceability
-        import uuid
+        # Generate Audit ID for traceability (also the orchestrator's checkpoint thread)
         audit_id = str(uuid.uuid4())
         
+        # Invoke the Orchestrator (The Brain)
+        result = await run_orchestrator(request.query, thread_id=audit_id)
+        
         # Log the final result for Phase 4 (Governance)
         batch_logger.log({
             "audit_id": audit_id,
@@ -74,26 +89,58 @@ def process_query(request: QueryRequest):
         print(f"Critical Error: {e}")
         raise HTTPException(status_code=500, detail="Internal Agent Error")
 
+@app.post("/query/stream")
+async def process_query_stream(request: QueryRequest):
+    """
+    Streaming variant of /query (Server-Sent Events).
+    Forwards the draft as it is generated to cut time-to-first-byte;
+    the final 'result' event carries the Critic's verdict.
+    """
+    audit_id = str(uuid.uuid4())
+
+    async def event_stream():
+        try:
+            async for event in stream_orchestrator(request.query, thread_id=audit_id):
+                data = event["data"]
+                if event["event"] == "result":
+                    # Log the final result for Phase 4 (Governance)
+                    batch_logger.log({
+                        "audit_id": audit_id,
+                        "user_id": request.user_id,
+                        "query": request.query,
+                        "result_status": data.get("status")
+                    })
+                    data = QueryResponse(
+                        status=data.get("status"),
+                        response=data.get("response"),
+                        audit_id=audit_id
+                    ).model_dump()
+                yield b"event: " + event["event"].encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            print(f"Critical Error: {e}")
+            yield b'event: error\ndata: {"detail":"Internal Agent Error"}\n\n'
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 # To run: uvicorn main:app --reload
 
 
 #### to display the graph
 # ... (after the process_query function) ...
+from functools import lru_cache
 from fastapi.responses import HTMLResponse
-@app.get("/graph", response_class=HTMLResponse)
-def visualize_graph():
+
+@lru_cache(maxsize=1)
+def render_graph_html() -> str:
     """
-    Generates a visual representation of the Master Agent's logic.
+    Builds the graph page once; the compiled graph never changes at runtime.
     """
-    try:
-        # Import the compiled graph from orchestrator
-        from app.agents.orchestrator import app_graph
-        
-        # Generate Mermaid code
-        mermaid_code = app_graph.get_graph().draw_mermaid()
-        
-        # Return HTML that renders the Mermaid code
-        return f"""
+    # Mermaid code pre-rendered by the orchestrator at import
+    from app.agents.orchestrator import MERMAID_CACHE as mermaid_code
+    
+    # Return HTML that renders the Mermaid code
+    return f"""
         <html>
             <head>
                 <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
@@ -107,6 +154,17 @@ def visualize_graph():
             </body>
         </html>
         """
+
+@app.get("/graph", response_class=HTMLResponse)
+def visualize_graph():
+    """
+    Generates a visual representation of the Master Agent's logic.
+    """
+    try:
+        return HTMLResponse(
+            render_graph_html(),
+            headers={"Cache-Control": "public, max-age=3600"}
+        )
     except Exception as e:
         return f"<html><body>Error generating graph: {str(e)}. <br> Ensure 'grandalf' is installed via pip.</body></html>"
     
@@ -0,0 +1,70 @@
+# tests/unit/test_embedding_batcher.py
+
+import asyncio
+
+from app.infrastructure.embeddings import EmbeddingBatcher
+
+
+class StubEmbeddings:
+    """Records each batched call and embeds a text as [len(text)]."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def aembed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_queries_share_one_call():
+    stub = StubEmbeddings()
+    batcher = EmbeddingBatcher(stub, max_wait_seconds=0.05)
+
+    async def run():
+        return await asyncio.gather(*[batcher.embed_query(q) for q in ["a", "bb", "ccc"]])
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [3.0]]
+    assert stub.calls == [["a", "bb", "ccc"]]
+
+
+def test_identical_queries_are_embedded_once():
+    stub = StubEmbeddings()
+    batcher = EmbeddingBatcher(stub, max_wait_seconds=0.05)
+
+    async def run():
+        return await asyncio.gather(*[batcher.embed_query("same") for _ in range(4)])
+
+    assert asyncio.run(run()) == [[4.0]] * 4
+    assert stub.calls == [["same"]]
+
+
+def test_full_batch_flushes_before_the_window_closes():
+    stub = StubEmbeddings()
+    batcher = EmbeddingBatcher(stub, max_batch_size=2, max_wait_seconds=10)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*[batcher.embed_query(q) for q in ["a", "b", "c", "d"]]),
+            timeout=1,
+        )
+
+    asyncio.run(run())
+    assert stub.calls == [["a", "b"], ["c", "d"]]
+
+
+def test_error_reaches_every_caller():
+    stub = StubEmbeddings(error=RuntimeError("rate limited"))
+    batcher = EmbeddingBatcher(stub, max_wait_seconds=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            *[batcher.embed_query(q) for q in ["a", "b", "c"]],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(stub.calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,54 @@
+# tests/unit/test_logging.py
+
+import contextlib
+import io
+import time
+
+from app.infrastructure.logging.batch import batch_logger
+from app.infrastructure.logging.stream import stream_logger
+
+
+class BrokenStdout:
+    """A stdout whose reader has gone away."""
+
+    def write(self, text):
+        raise BrokenPipeError()
+
+    def flush(self):
+        raise BrokenPipeError()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_stream_logger_writes_to_text_only_stdout():
+    stdout = io.StringIO()
+
+    with contextlib.redirect_stdout(stdout):
+        stream_logger.log("[Planner] hello")
+
+    assert stdout.getvalue().endswith("]: [Planner] hello\n")
+
+
+def test_stream_logger_never_raises_on_broken_stdout(capsys):
+    with contextlib.redirect_stdout(BrokenStdout()):
+        stream_logger.log("[Planner] hello")
+
+    assert "BrokenPipeError" in capsys.readouterr().err
+
+
+def test_batch_logger_survives_a_failed_write(capsys):
+    with contextlib.redirect_stdout(BrokenStdout()):
+        batch_logger.log({"event": "lost"})
+        assert _wait_for(lambda: "BrokenPipeError" in capsys.readouterr().err)
+
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        batch_logger.log({"event": "after_failure"})
+        assert _wait_for(lambda: "after_failure" in stdout.getvalue())
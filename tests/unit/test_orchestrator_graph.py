@@ -0,0 +1,73 @@
+# tests/unit/test_orchestrator_graph.py
+
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+import app.agents.orchestrator as orchestrator
+
+
+class RejectingCritic:
+    """Rejects every draft and counts how many it saw."""
+
+    def __init__(self):
+        self.drafts = []
+
+    def validate(self, draft):
+        self.drafts.append(draft)
+        return {"status": "REJECTED", "reason": "unsafe", "log": "rejected"}
+
+
+@pytest.fixture
+def critic(monkeypatch, tmp_path):
+    critic = RejectingCritic()
+    llm = FakeListChatModel(responses=["draft answer"] * 10)
+    monkeypatch.setattr(orchestrator, "get_llm", lambda: llm)
+    monkeypatch.setattr(orchestrator, "get_safety_critic", lambda: critic)
+    monkeypatch.setattr(orchestrator.settings, "CHECKPOINT_DB_PATH", str(tmp_path / "state.db"))
+    return critic
+
+
+def test_rejected_drafts_are_bounded(critic):
+    final_state = asyncio.run(
+        orchestrator.app_graph.ainvoke(orchestrator._initial_state("flow at 200 m3/h"))
+    )
+
+    assert final_state["retries"] == 2
+    assert final_state["is_safe"] is False
+    assert len(critic.drafts) == 3
+
+    drafts = [m for m in final_state["messages"] if isinstance(m, AIMessage)]
+    assert len(drafts) == 3
+    assert all(m.additional_kwargs["safety_status"] == "REJECTED" for m in drafts)
+
+
+def test_checkpointing_is_off_by_default(critic, tmp_path):
+    result = asyncio.run(orchestrator.run_orchestrator("flow at 200 m3/h"))
+
+    assert result["status"] == "BLOCKED_BY_SAFETY"
+    assert not (tmp_path / "state.db").exists()
+
+
+def test_stream_reports_each_retry(critic):
+    async def collect():
+        try:
+            return [event async for event in orchestrator.stream_orchestrator("flow at 200 m3/h")]
+        finally:
+            await orchestrator.close_checkpointer()
+
+    events = asyncio.run(collect())
+
+    assert [e["event"] for e in events].count("retry") == 2
+    assert events[-1]["data"]["status"] == "BLOCKED_BY_SAFETY"
+    assert len(critic.drafts) == 3
+
+
+def test_trivial_reply_is_in_the_audit_trail(critic):
+    result = asyncio.run(orchestrator.run_orchestrator("hello"))
+
+    assert result["status"] == "SUCCESS"
+    assert result["audit_trail"][-1].content == orchestrator.TRIVIAL_RESPONSE
+    assert critic.drafts == []
@@ -0,0 +1,49 @@
+# tests/unit/test_planner_intent.py
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import app.agents.orchestrator as orchestrator
+from app.schemas.planner import PlannerDecision
+
+
+@pytest.fixture(autouse=True)
+def no_tools_planner(monkeypatch):
+    """The LLM fallback answers 'no tools', so only the keyword heuristics route."""
+    planner = RunnableLambda(lambda messages: PlannerDecision(use_rag=False, use_sim=False))
+    monkeypatch.setattr(orchestrator, "get_planner_llm", lambda: planner)
+
+
+def _intent(query):
+    return asyncio.run(orchestrator.node_planner({"query": query}))["intent"]
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("What is the pressure at a flow of 200 m3/h?", "calculation"),
+    ("Is 1100 PSI within limits for this pipeline?", "calculation"),
+    ("What does the manual say about valve maintenance?", "retrieval"),
+    ("Check the safety limit for 1100 psi on line 4", "hybrid"),
+    ("What is the maximum rated pressure on line four?", "direct"),
+    ("hello", "trivial"),
+    ("Thanks a lot!", "trivial"),
+    ("what should I do about the pump", "direct"),
+    ("hello, what should I do about the pump", "direct"),
+])
+def test_keyword_routing(query, intent):
+    assert _intent(query) == intent
+
+
+def test_digit_heavy_input_is_classified_in_linear_time():
+    # A pasted sensor log: many digits, no unit. A "digit ... unit" pattern
+    # backtracks quadratically here (tens of ms at 4k chars, seconds at 40k).
+    log = "reading 12345 67890 " * 2000
+
+    start = time.perf_counter()
+    intent = _intent(log)
+    elapsed = time.perf_counter() - start
+
+    assert intent == "direct"
+    assert elapsed < 0.1
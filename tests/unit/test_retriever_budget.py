@@ -0,0 +1,56 @@
+# tests/unit/test_retriever_budget.py
+
+import pytest
+
+import app.tools.retriever as retriever
+from app.tools.retriever import CHARS_PER_TOKEN, _fit_to_budget
+
+
+@pytest.fixture
+def char_estimate(monkeypatch):
+    """Budget with the character estimate, so sizes are exact and offline-safe."""
+    monkeypatch.setattr(retriever, "_get_encoding", lambda: None)
+
+
+def _chunk(letter, tokens):
+    return letter * (tokens * CHARS_PER_TOKEN)
+
+
+def test_duplicate_chunks_are_dropped(char_estimate):
+    a, b = _chunk("a", 10), _chunk("b", 10)
+
+    assert _fit_to_budget([a, b, a], max_tokens=100) == [a, b]
+
+
+def test_stops_at_the_budget(char_estimate):
+    a, b, c = _chunk("a", 40), _chunk("b", 40), _chunk("c", 40)
+
+    assert _fit_to_budget([a, b, c], max_tokens=100) == [a, b]
+
+
+def test_oversized_first_chunk_is_truncated(char_estimate):
+    big = _chunk("a", 500)
+
+    kept = _fit_to_budget([big, _chunk("b", 10)], max_tokens=100)
+
+    assert kept == [big[:100 * CHARS_PER_TOKEN]]
+
+
+def test_failed_encoding_load_is_retried(monkeypatch):
+    calls = []
+
+    def encoding_for_model(model):
+        calls.append(model)
+        if len(calls) == 1:
+            raise OSError("offline")
+        return "encoding"
+
+    monkeypatch.setattr(retriever.tiktoken, "encoding_for_model", encoding_for_model)
+    monkeypatch.setattr(retriever, "_encoding", None)
+    monkeypatch.setattr(retriever, "_encoding_failed_at", None)
+    monkeypatch.setattr(retriever, "ENCODING_RETRY_SECONDS", 0)
+
+    assert retriever._get_encoding() is None
+    assert retriever._get_encoding() == "encoding"
+    assert retriever._get_encoding() == "encoding"
+    assert len(calls) == 2
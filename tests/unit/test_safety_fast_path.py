@@ -0,0 +1,76 @@
+# tests/unit/test_safety_fast_path.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.safety import SafetyCritic
+
+
+class RecordingGuard:
+    """
+    Stands in for the RAIL Guard and records whether it was consulted.
+    Like the real Guard, it reports a failed validation on the outcome
+    instead of raising (tests/unit/test_safety_guard.py runs the real one).
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def parse(self, draft):
+        self.calls.append(draft)
+        return SimpleNamespace(validation_passed=False, validated_output=None, error="guard consulted")
+
+
+@pytest.fixture
+def critic():
+    critic = SafetyCritic.__new__(SafetyCritic)
+    critic.guard = RecordingGuard()
+    return critic
+
+
+def test_clean_draft_skips_guard(critic):
+    draft = """
+    {
+        "summary": "pressure at 1100 PSI is within safe operating limits.",
+        "risk_level": "LOW",
+        "recommended_action": "proceed with standard monitoring.",
+        "is_safe": true
+    }
+    """
+    result = critic.validate(draft)
+
+    assert result["status"] == "APPROVED"
+    assert result["data"]["risk_level"] == "LOW"
+    assert result["data"]["is_safe"] is True
+    assert critic.guard.calls == []
+
+
+@pytest.mark.parametrize("summary", [
+    "Contact ops@example.com before restart.",
+    "Call +1 (555) 010-9999 before restart.",
+    "Call 555-0199 now.",
+    "Ask John before restart.",
+    "John approved the restart.",
+    "Pressure fine. Maria will check the valve.",
+    "Ask Ölaf before restart.",
+])
+def test_pii_like_text_defers_to_guard(critic, summary):
+    draft = (
+        '{"summary": "%s", "risk_level": "LOW", '
+        '"recommended_action": "proceed.", "is_safe": true}' % summary
+    )
+    result = critic.validate(draft)
+
+    assert result["status"] == "REJECTED"
+    assert len(critic.guard.calls) == 1
+
+
+@pytest.mark.parametrize("draft", [
+    "The pressure looks okay, just go ahead and open the valve.",
+    '{"summary": "Unknown.", "risk_level": "SUPER_HIGH", "recommended_action": "Check.", "is_safe": true}',
+])
+def test_invalid_draft_defers_to_guard(critic, draft):
+    critic.validate(draft)
+
+    assert critic.guard.calls == [draft]
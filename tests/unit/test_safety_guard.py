@@ -0,0 +1,37 @@
+# tests/unit/test_safety_guard.py
+# Runs the real RAIL Guard (no stub), with the fast path disabled.
+
+import pytest
+
+import app.agents.safety as safety
+from app.agents.safety import SafetyCritic
+
+
+@pytest.fixture
+def critic(monkeypatch):
+    monkeypatch.setattr(safety, "_fast_validate", lambda draft: None)
+    return SafetyCritic()
+
+
+@pytest.mark.parametrize("draft", [
+    "Open the relief valve now, John at 555-123-4567 confirmed.",
+    "Keep pressure below 1100 psi.",
+    '{"summary": "Unknown.", "risk_level": "CRITICAL", "recommended_action": "Check.", "is_safe": true}',
+    '{"summary": "Unknown.", "risk_level": "LOW"}',
+])
+def test_guard_rejects_invalid_drafts(critic, draft):
+    result = critic.validate(draft)
+
+    assert result["status"] == "REJECTED"
+    assert result["reason"].startswith("RAIL Safety Violation")
+
+
+def test_guard_approves_valid_draft(critic):
+    draft = (
+        '{"summary": "Pressure is within limits.", "risk_level": "MEDIUM", '
+        '"recommended_action": "Monitor the line.", "is_safe": true}'
+    )
+    result = critic.validate(draft)
+
+    assert result["status"] == "APPROVED"
+    assert result["data"]["risk_level"] == "MEDIUM"
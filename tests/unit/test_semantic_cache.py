@@ -0,0 +1,69 @@
+# tests/unit/test_semantic_cache.py
+
+from app.tools.semantic_cache import SemanticCache
+
+
+def test_exact_query_hit_skips_embedding():
+    cache = SemanticCache()
+    cache.put("What is the H2S limit?", [1.0, 0.0], "H2S limit: 10 ppm")
+
+    assert cache.get_exact("What is the H2S limit?") == "H2S limit: 10 ppm"
+    assert cache.get_exact("What is the CO2 limit?") is None
+
+
+def test_near_duplicate_query_hit():
+    cache = SemanticCache(similarity_threshold=0.95)
+    cache.put("What is the H2S limit?", [1.0, 0.0], "H2S limit: 10 ppm")
+
+    assert cache.get("what is the h2s limit", [0.99, 0.05]) == "H2S limit: 10 ppm"
+
+
+def test_dissimilar_embedding_misses():
+    cache = SemanticCache(similarity_threshold=0.95)
+    cache.put("What is the H2S limit?", [1.0, 0.0], "H2S limit: 10 ppm")
+
+    assert cache.get("What is the H2S limit?", [0.0, 1.0]) is None
+
+
+def test_lexical_gate_blocks_different_values():
+    cache = SemanticCache(similarity_threshold=0.95, min_jaccard=0.9)
+    cache.put("pressure at 200 psi", [1.0, 0.0], "context for 200 psi")
+
+    assert cache.get("pressure at 900 psi", [1.0, 0.0]) is None
+
+
+def test_different_numbers_miss_on_long_queries():
+    cache = SemanticCache()
+    cache.put("what is the rated maximum pressure for pump A at 200 psi", [1.0, 0.0], "context for 200 psi")
+
+    assert cache.get("what is the rated maximum pressure for pump A at 900 psi", [1.0, 0.0]) is None
+    assert cache.get("What is the rated maximum pressure for pump A at 200 psi?", [1.0, 0.0]) == "context for 200 psi"
+
+
+def test_evicted_slot_is_reused():
+    cache = SemanticCache(max_entries=2)
+    cache.put("first", [1.0, 0.0], "first context")
+    cache.put("second", [0.0, 1.0], "second context")
+    cache.put("third", [0.6, 0.8], "third context")
+
+    assert cache.get("first", [1.0, 0.0]) is None
+    assert cache.get("second", [0.0, 1.0]) == "second context"
+    assert cache.get("third", [0.6, 0.8]) == "third context"
+
+
+def test_lru_eviction():
+    cache = SemanticCache(max_entries=1)
+    cache.put("first", [1.0, 0.0], "first context")
+    cache.put("second", [0.0, 1.0], "second context")
+
+    assert len(cache) == 1
+    assert cache.get_exact("first") is None
+    assert cache.get_exact("second") == "second context"
+
+
+def test_expired_entries_miss():
+    cache = SemanticCache(ttl_seconds=-1)
+    cache.put("first", [1.0, 0.0], "first context")
+
+    assert cache.get_exact("first") is None
+    assert cache.get("first", [1.0, 0.0]) is None
@@ -0,0 +1,37 @@
+# tests/unit/test_simulator.py
+
+import numpy as np
+import pytest
+
+from app.tools.simulator import calc_pressure_flow, calc_pressure_flow_batch
+
+
+def test_calc_pressure_flow_nominal():
+    result = calc_pressure_flow(flow_rate=200)
+
+    assert result["status"] == "NOMINAL"
+    assert result["warning"] is None
+    assert result["estimated_pressure_psi"] == pytest.approx(1000.62, abs=0.01)
+
+
+def test_calc_pressure_flow_high_pressure_warning():
+    result = calc_pressure_flow(flow_rate=5000)
+
+    assert result["status"] == "HIGH_PRESSURE_WARNING"
+    assert result["warning"] is not None
+
+
+def test_calc_pressure_flow_negative_rejected():
+    result = calc_pressure_flow(flow_rate=-1)
+
+    assert result["status"] == "ERROR"
+    assert result["estimated_pressure_psi"] == 0.0
+
+
+def test_calc_pressure_flow_batch_matches_scalar():
+    flow_rates = np.array([0.0, 50.0, 200.0, 5000.0, -5.0])
+
+    pressures = calc_pressure_flow_batch(flow_rates)
+
+    expected = [calc_pressure_flow(f)["estimated_pressure_psi"] for f in flow_rates]
+    assert np.round(pressures, 2).tolist() == expected